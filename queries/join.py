@@ -1,7 +1,15 @@
-from utils.loader import load_schemas_from_folder, get_all_properties
+from utils.loader import load_database_schemas, validate_collection_keys
+from utils.costs import COST_KEYS
 from .filter import compute_filter_query_costs
 
-from pathlib import Path
+PER_COLLECTION_KEYS = (
+    "nb_servers_checked",
+    "nb_output_docs",
+    "scanned_doc_byte_size",
+    "scanned_data_byte_size",
+    "output_doc_byte_size",
+    "output_data_byte_size",
+)
 
 def compute_join_query_costs(
     database: str,
@@ -13,8 +21,7 @@ def compute_join_query_costs(
     sharding_keys: dict[str, str]
 ):
     # Import schemas
-    schemas_path = Path(f"schemas/{database}")
-    schemas = load_schemas_from_folder(schemas_path)
+    schemas = load_database_schemas(database)
 
     # Validate collections
     for collection in collections:
@@ -22,94 +29,56 @@ def compute_join_query_costs(
             raise ValueError(f"Collection '{collection}' not found in schemas")
     
     for collection in collections:
-        schema = schemas[collection]
-        properties = get_all_properties(schema).keys()
+        if sharding[collection] and not sharding_keys[collection]:
+            raise ValueError("Sharding key must be provided when sharding is enabled")
 
-        # Validate output keys
-        for key in output_keys[collection]:
-            if key not in properties:
-                available_keys = ", ".join(properties)
-                raise ValueError(
-                    f"Output key '{key}' is not a property of collection '{collection}'. "
-                    f"Available properties: {available_keys}"
-                )
-        
-        # Validate join keys
-        if join_keys[collection] not in properties:
-            available_keys = ", ".join(properties)
-            raise ValueError(
-                f"Join key '{join_keys[collection]}' not found in collection '{collection}'"
-                f"Available properties: {available_keys}"
-            )
-        
-        # Validate filter keys
-        for key in filter_keys[collection]:
-            if key not in properties:
-                available_keys = ", ".join(properties)
-                raise ValueError(
-                    f"Filter key '{key}' is not a property of collection '{collection}'. "
-                    f"Available properties: {available_keys}"
-                )
+        validate_collection_keys(database, collection, {
+            "Output": set(output_keys[collection]),
+            "Join": {join_keys[collection]},
+            "Filter": set(filter_keys[collection]),
+            "Sharding": {sharding_keys[collection]} if sharding[collection] else set(),
+        }, schemas=schemas)
 
-        # Validate sharding key
-        if sharding[collection]:
-            if not sharding_keys[collection]:
-                raise ValueError("Sharding key must be provided when sharding is enabled")
-            if sharding_keys[collection] not in properties:
-                available_keys = ", ".join(properties)
-                raise ValueError(
-                    f"Sharding key '{sharding_keys[collection]}' is not a property of collection '{collection}'. "
-                    f"Available properties: {available_keys}"
-                )
+    c0, c1 = collections
 
     collection1_results = compute_filter_query_costs(
         database=database,
-        collection=collections[0],
-        output_keys=output_keys[collections[0]] + [join_keys[collections[0]]],
-        filter_keys=filter_keys[collections[0]],
-        sharding=sharding[collections[0]],
-        sharding_key=sharding_keys[collections[0]] if sharding[collections[0]] else None,
+        collection=c0,
+        output_keys=output_keys[c0] + [join_keys[c0]],
+        filter_keys=filter_keys[c0],
+        sharding=sharding[c0],
+        sharding_key=sharding_keys[c0] if sharding[c0] else None,
+        schemas=schemas,
+        validate_keys=False,
     )
 
-    print(collection1_results["nb_output_docs"])
-
-    collection2_results = compute_filter_query_costs(
-        database=database,
-        collection=collections[1],
-        output_keys=output_keys[collections[1]],
-        filter_keys=filter_keys[collections[1]] + [join_keys[collections[1]]],
-        sharding=sharding[collections[1]],
-        sharding_key=sharding_keys[collections[1]] if sharding[collections[1]] else None,
-    )
+    # The second collection is never queried if the first one outputs no document
+    if collection1_results["nb_output_docs"] == 0:
+        collection2_results = dict.fromkeys(PER_COLLECTION_KEYS + COST_KEYS, 0)
+    else:
+        collection2_results = compute_filter_query_costs(
+            database=database,
+            collection=c1,
+            output_keys=output_keys[c1],
+            filter_keys=filter_keys[c1] + [join_keys[c1]],
+            sharding=sharding[c1],
+            sharding_key=sharding_keys[c1] if sharding[c1] else None,
+            schemas=schemas,
+            validate_keys=False,
+        )
 
+    # Each collection's metrics, and the costs of one query on the first collection
+    # plus one query on the second collection per document it outputs
+    nb_loops = collection1_results["nb_output_docs"]
     total_costs = {
-        "nb_servers_checked": {
-            collections[0]: collection1_results["nb_servers_checked"],
-            collections[1]: collection2_results["nb_servers_checked"]
-        },
-        "nb_output_docs": {
-            collections[0]: collection1_results["nb_output_docs"],
-            collections[1]: collection2_results["nb_output_docs"]
-        },
-        "scanned_doc_byte_size": {
-            collections[0]: collection1_results["scanned_doc_byte_size"],
-            collections[1]: collection2_results["scanned_doc_byte_size"]
-        },
-        "scanned_data_byte_size": {
-            collections[0]: collection1_results["scanned_data_byte_size"],
-            collections[1]: collection2_results["scanned_data_byte_size"]
-        },
-        "output_doc_byte_size": {
-            collections[0]: collection1_results["output_doc_byte_size"],
-            collections[1]: collection2_results["output_doc_byte_size"]
+        **{
+            key: {c0: collection1_results[key], c1: collection2_results[key]}
+            for key in PER_COLLECTION_KEYS
         },
-        "output_data_byte_size": {
-            collections[0]: collection1_results["output_data_byte_size"],
-            collections[1]: collection2_results["output_data_byte_size"]
+        **{
+            key: collection1_results[key] + nb_loops * collection2_results[key]
+            for key in COST_KEYS
         },
-        "time_cost_seconds": collection1_results["time_cost_seconds"] + collection1_results["nb_output_docs"] * collection2_results["time_cost_seconds"],
-        "carbon_footprint_kgCO2eq": collection1_results["carbon_footprint_kgCO2eq"] + collection1_results["nb_output_docs"] * collection2_results["carbon_footprint_kgCO2eq"],
-        "price_cost_€": collection1_results["price_cost_€"] + collection1_results["nb_output_docs"] * collection2_results["price_cost_€"]
     }
 
-    return total_costs
\ No newline at end of file
+    return total_costs
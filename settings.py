@@ -31,6 +31,21 @@ STATISTICS = {
     "distinct_dates": 365
 }
 
+# Number of distinct values indexed by key name (e.g. "IDP", "brand")
+DISTINCT_VALUES = {
+    stat.removeprefix("distinct_").removesuffix("s"): value
+    for stat, value in STATISTICS.items()
+    if stat.startswith("distinct_")
+}
+
+# Average number of documents per referenced document, indexed by (collection, referenced collection)
+# in lower case (e.g. ("orderline", "product"))
+AVG_VALUES_BY = {
+    (stat.removeprefix("avg_").split("_by_")[0].removesuffix("s"), stat.split("_by_")[1]): value
+    for stat, value in STATISTICS.items()
+    if stat.startswith("avg_")
+}
+
 PRIMARY_KEYS_TABLE = {
     "IDP": "Product",
     "IDW": "Warehouse",
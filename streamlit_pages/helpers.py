@@ -0,0 +1,30 @@
+import os
+
+from utils.loader import load_database_schemas
+from utils.size import get_all_properties
+
+# Helper function to get available databases
+def get_available_databases():
+    # Directory entries already know their type, so no stat call is needed per entry
+    with os.scandir("schemas") as entries:
+        return [d.name for d in entries if d.is_dir() and d.name != "default"]
+
+# Helper function to get collections from a database
+def get_collections(database):
+    schemas = load_database_schemas(database)
+    return list(schemas.keys())
+
+# Helper function to get properties from a collection
+def get_properties(database, collection):
+    schemas = load_database_schemas(database)
+    if collection in schemas:
+        return list(get_all_properties(schemas[collection]).keys())
+    return []
+
+# Preferred output keys available in the collection, or its first two properties
+def get_default_outputs(properties_index, preferred_keys):
+    return [key for key in preferred_keys if key in properties_index] or list(properties_index)[:2]
+
+# Byte sizes are shown in bytes below 1 MB and in GB above
+def format_byte_size(size):
+    return f"{size:,} B" if size < 10**6 else f"{size/10**9:.3f} GB"
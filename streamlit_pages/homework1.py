@@ -12,17 +12,27 @@ st.title("Homework 1")
 
 tab1, tab2 = st.tabs(["Database Size Computation", "Sharding Distribution"])
 
-def get_schema(db_name):
-    if db_name == "db1":
-        return "DB1 - Prod{[Cat],Supp}, St, Wa, OL, Cl"
-    elif db_name == "db2":
-        return "DB2 - Prod{[Cat],Supp, [St]}, Wa, OL, Cl"
-    elif db_name == "db3":
-        return "DB3 - St{Prod{[Cat],Supp}}, Wa, OL, Cl"
-    elif db_name == "db4":
-        return "DB4 - St, Wa, OL{Prod{[Cat],Supp}}, Cl"
-    elif db_name == "db5":
-        return "DB5 - Prod{[Cat],Supp, [OL]}, St, Wa, Cl"
+DB_SCHEMA_LABELS = {
+    "db1": "DB1 - Prod{[Cat],Supp}, St, Wa, OL, Cl",
+    "db2": "DB2 - Prod{[Cat],Supp, [St]}, Wa, OL, Cl",
+    "db3": "DB3 - St{Prod{[Cat],Supp}}, Wa, OL, Cl",
+    "db4": "DB4 - St, Wa, OL{Prod{[Cat],Supp}}, Cl",
+    "db5": "DB5 - Prod{[Cat],Supp, [OL]}, St, Wa, Cl",
+}
+
+# Results only depend on their arguments and the schema files, so they are computed once per input
+# (Streamlit hands out a copy of the cached dict on each call)
+@st.cache_data(show_spinner=False)
+def cached_db_size(schemas_folder_path: str) -> dict:
+    return compute_db_size(schemas_folder_path)
+
+@st.cache_data(show_spinner=False)
+def cached_sharding_distribution(collection_name: str, sharding_key: str) -> dict:
+    return compute_sharding_distribution(collection_name, sharding_key)
+
+# Schema files may be edited while the app is running
+if st.sidebar.button("Clear cache"):
+    st.cache_data.clear()
 
 # Database Size Computation Tab
 with tab1:
@@ -36,35 +46,30 @@ with tab1:
     selected_schema = st.selectbox(
         "Select Database Schema:",
         available_schemas,
-        format_func=get_schema
+        format_func=DB_SCHEMA_LABELS.get
     )
     
     # Automatically compute database size
     if st.button("Compute Database Size", type="primary"):
         with st.spinner("Computing database size..."):
-            results = compute_db_size(f"schemas/{selected_schema}")
+            results = cached_db_size(f"schemas/{selected_schema}")
+            total_size = results.pop("total_database_byte_size", 0)
             
             # Display results in a structured way
             col1, col2 = st.columns(2)
+            col1.subheader("Document Sizes")
+            col2.subheader("Collection Sizes")
             
-            with col1:
-                st.subheader("Document Sizes")
-                for collection, sizes in results.items():
-                    if collection != "total_database_byte_size" and isinstance(sizes, dict):
-                        doc_size = sizes.get("document_byte_size", 0)
-                        st.metric(f"{collection}", f"{doc_size:,} B")
-            
-            with col2:
-                st.subheader("Collection Sizes")
-                for collection, sizes in results.items():
-                    if collection != "total_database_byte_size" and isinstance(sizes, dict):
-                        coll_size = sizes.get("collection_byte_size", 0)
-                        if coll_size > 10**6:
-                            st.metric(f"{collection}", f"{coll_size/10**9:.3f} GB")
-                        else:
-                            st.metric(f"{collection}", f"{coll_size} B")
+            for collection, sizes in results.items():
+                doc_size = sizes.get("document_byte_size", 0)
+                col1.metric(f"{collection}", f"{doc_size:,} B")
+                
+                coll_size = sizes.get("collection_byte_size", 0)
+                if coll_size > 10**6:
+                    col2.metric(f"{collection}", f"{coll_size/10**9:.3f} GB")
+                else:
+                    col2.metric(f"{collection}", f"{coll_size} B")
             
-            total_size = results.get("total_database_byte_size", 0)
             st.subheader(f"Total Database Size : {total_size/10**9:.3f} GB")
 
 # Sharding Distribution Tab
@@ -94,7 +99,7 @@ with tab2:
     if st.button("Compute Sharding Distribution", type="primary"):
         with st.spinner("Computing sharding distribution..."):
             try:
-                results = compute_sharding_distribution(selected_collection, sharding_key)
+                results = cached_sharding_distribution(selected_collection, sharding_key)
             except ValueError as e:
                 st.error(str(e))
                 st.stop()
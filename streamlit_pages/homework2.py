@@ -1,11 +1,15 @@
 import streamlit as st
-from pathlib import Path
 
 from queries.filter import compute_filter_query_costs
 from queries.join import compute_join_query_costs
 
-from utils.loader import load_schemas_from_folder
-from utils.size import get_all_properties
+from streamlit_pages.helpers import (
+    get_available_databases,
+    get_collections,
+    get_properties,
+    get_default_outputs,
+    format_byte_size,
+)
 
 st.set_page_config(page_title="Homework 2", layout="wide")
 
@@ -13,31 +17,12 @@ st.title("Homework 2")
 
 tab1, tab2 = st.tabs(["Filter Query Costs", "Join Query Costs"])
 
-# Helper function to get available databases
-def get_available_databases():
-    schemas_path = Path("schemas")
-    return [d.name for d in schemas_path.iterdir() if d.is_dir() and d.name != "default"]
-
-# Helper function to get collections from a database
-def get_collections(database):
-    schemas_path = Path(f"schemas/{database}")
-    schemas = load_schemas_from_folder(schemas_path)
-    return list(schemas.keys())
-
-# Helper function to get properties from a collection
-def get_properties(database, collection):
-    schemas_path = Path(f"schemas/{database}")
-    schemas = load_schemas_from_folder(schemas_path)
-    if collection in schemas:
-        return list(get_all_properties(schemas[collection]).keys())
-    return []
-
 # Filter Query Costs Tab
 with tab1:
     st.header("Filter Query Costs")
     st.write("Compute the costs of executing a filter query on a collection")
     
-    # Database selection
+    # Database selection (shared by both tabs)
     databases = get_available_databases()
     default_db_index = databases.index("db1") if "db1" in databases else 0
     selected_db = st.selectbox("Select Database:", databases, index=default_db_index, key="filter_db")
@@ -49,53 +34,55 @@ with tab1:
     
     # Get available properties
     properties = get_properties(selected_db, selected_collection)
+    # Position of each property, for default selections
+    properties_index = {key: i for i, key in enumerate(properties)}
     
-    col1, col2 = st.columns(2)
+    # Parameters are only applied on submit, so editing them does not rerun the page
+    with st.form("filter_form"):
+        col1, col2 = st.columns(2)
     
-    with col1:
-        # Output keys selection
-        st.subheader("Output Keys")
-        default_output = [k for k in ["quantity", "location"] if k in properties]
-        if not default_output:
-            default_output = properties[:min(2, len(properties))]
-        output_keys = st.multiselect(
-            "Select keys to include in output:",
-            properties,
-            default=default_output,
-            key="filter_output"
-        )
+        with col1:
+            # Output keys selection
+            st.subheader("Output Keys")
+            default_output = get_default_outputs(properties_index, ["quantity", "location"])
+            output_keys = st.multiselect(
+                "Select keys to include in output:",
+                properties,
+                default=default_output,
+                key="filter_output"
+            )
     
-    with col2:
-        # Filter keys selection
-        st.subheader("Filter Keys")
-        default_filter = [k for k in ["IDP", "IDW"] if k in properties]
-        filter_keys = st.multiselect(
-            "Select keys to filter by:",
-            properties,
-            default=default_filter,
-            key="filter_keys"
-        )
+        with col2:
+            # Filter keys selection
+            st.subheader("Filter Keys")
+            default_filter = [k for k in ["IDP", "IDW"] if k in properties_index]
+            filter_keys = st.multiselect(
+                "Select keys to filter by:",
+                properties,
+                default=default_filter,
+                key="filter_keys"
+            )
     
-    # Sharding options
-    st.subheader("Sharding Configuration")
-    col1, col2 = st.columns(2)
+        # Sharding options
+        st.subheader("Sharding Configuration")
+        col1, col2 = st.columns(2)
     
-    with col1:
-        sharding_enabled = st.checkbox("Enable Sharding", value=True, key="filter_sharding")
+        with col1:
+            sharding_enabled = st.checkbox("Enable Sharding", value=True, key="filter_sharding")
     
-    with col2:
-        sharding_key = None
-        if sharding_enabled:
-            default_shard_index = properties.index("IDP") if "IDP" in properties else 0
+        with col2:
+            default_shard_index = properties_index.get("IDP", 0)
             sharding_key = st.selectbox(
                 "Sharding Key:",
                 properties,
                 index=default_shard_index,
                 key="filter_sharding_key"
             )
+        
+        # Compute button
+        submitted = st.form_submit_button("Compute Filter Query Costs", type="primary")
     
-    # Compute button
-    if st.button("Compute Filter Query Costs", type="primary", key="filter_compute"):
+    if submitted:
         if not output_keys:
             st.error("Please select at least one output key")
         else:
@@ -143,14 +130,14 @@ with tab1:
                         scanned_size = results['scanned_data_byte_size']
                         st.metric(
                             "Total Scanned Data",
-                            f"{scanned_size:,} B" if scanned_size < 10**6 else f"{scanned_size/10**9:.3f} GB"
+                            format_byte_size(scanned_size)
                         )
                     
                     with col2:
                         output_size = results['output_data_byte_size']
                         st.metric(
                             "Total Output Data",
-                            f"{output_size:,} B" if output_size < 10**6 else f"{output_size/10**9:.3f} GB"
+                            format_byte_size(output_size)
                         )
                     
                     # Cost metrics
@@ -188,9 +175,7 @@ with tab2:
     st.write("Compute the costs of executing a join query between two collections")
     
     # Database selection
-    databases_join = get_available_databases()
-    default_db_join_index = databases_join.index("db1") if "db1" in databases_join else 0
-    selected_db_join = st.selectbox("Select Database:", databases_join, index=default_db_join_index, key="join_db")
+    selected_db_join = st.selectbox("Select Database:", databases, index=default_db_index, key="join_db")
     
     # Collections selection
     collections_join = get_collections(selected_db_join)
@@ -214,48 +199,47 @@ with tab2:
     # Get properties for both collections
     properties1 = get_properties(selected_db_join, collection1)
     properties2 = get_properties(selected_db_join, collection2)
+    properties1_index = {key: i for i, key in enumerate(properties1)}
+    properties2_index = {key: i for i, key in enumerate(properties2)}
     
-    # Configuration for Collection 1
-    st.subheader(f"Configuration for {collection1}")
-    col1, col2, col3 = st.columns(3)
+    with st.form("join_form"):
+        # Configuration for Collection 1
+        st.subheader(f"Configuration for {collection1}")
+        col1, col2, col3 = st.columns(3)
     
-    with col1:
-        # Default for Product: ["name", "price"]
-        default_output1 = [k for k in ["name", "price"] if k in properties1]
-        if not default_output1:
-            default_output1 = properties1[:min(2, len(properties1))]
-        output_keys1 = st.multiselect(
-            "Output Keys:",
-            properties1,
-            default=default_output1,
-            key="join_output1"
-        )
+        with col1:
+            # Default for Product: ["name", "price"]
+            default_output1 = get_default_outputs(properties1_index, ["name", "price"])
+            output_keys1 = st.multiselect(
+                "Output Keys:",
+                properties1,
+                default=default_output1,
+                key="join_output1"
+            )
     
-    with col2:
-        default_join1_index = properties1.index("IDP") if "IDP" in properties1 else 0
-        join_key1 = st.selectbox(
-            "Join Key:",
-            properties1,
-            index=default_join1_index,
-            key="join_key1"
-        )
+        with col2:
+            default_join1_index = properties1_index.get("IDP", 0)
+            join_key1 = st.selectbox(
+                "Join Key:",
+                properties1,
+                index=default_join1_index,
+                key="join_key1"
+            )
     
-    with col3:
-        default_filter1 = [k for k in ["brand"] if k in properties1]
-        filter_keys1 = st.multiselect(
-            "Filter Keys:",
-            properties1,
-            default=default_filter1,
-            key="join_filter1"
-        )
+        with col3:
+            default_filter1 = [k for k in ["brand"] if k in properties1_index]
+            filter_keys1 = st.multiselect(
+                "Filter Keys:",
+                properties1,
+                default=default_filter1,
+                key="join_filter1"
+            )
     
-    col1, col2 = st.columns(2)
-    with col1:
-        sharding1 = st.checkbox(f"Enable Sharding for {collection1}", value=True, key="join_shard1")
-    with col2:
-        sharding_key1 = None
-        if sharding1:
-            default_shard1_index = properties1.index("brand") if "brand" in properties1 else 0
+        col1, col2 = st.columns(2)
+        with col1:
+            sharding1 = st.checkbox(f"Enable Sharding for {collection1}", value=True, key="join_shard1")
+        with col2:
+            default_shard1_index = properties1_index.get("brand", 0)
             sharding_key1 = st.selectbox(
                 f"Sharding Key for {collection1}:",
                 properties1,
@@ -263,58 +247,56 @@ with tab2:
                 key="join_shard_key1"
             )
     
-    st.divider()
+        st.divider()
     
-    # Configuration for Collection 2
-    st.subheader(f"Configuration for {collection2}")
-    col1, col2, col3 = st.columns(3)
+        # Configuration for Collection 2
+        st.subheader(f"Configuration for {collection2}")
+        col1, col2, col3 = st.columns(3)
     
-    with col1:
-        # Default for Stock: ["IDW", "quantity"]
-        default_output2 = [k for k in ["IDW", "quantity"] if k in properties2]
-        if not default_output2:
-            default_output2 = properties2[:min(2, len(properties2))]
-        output_keys2 = st.multiselect(
-            "Output Keys:",
-            properties2,
-            default=default_output2,
-            key="join_output2"
-        )
+        with col1:
+            # Default for Stock: ["IDW", "quantity"]
+            default_output2 = get_default_outputs(properties2_index, ["IDW", "quantity"])
+            output_keys2 = st.multiselect(
+                "Output Keys:",
+                properties2,
+                default=default_output2,
+                key="join_output2"
+            )
     
-    with col2:
-        default_join2_index = properties2.index("IDP") if "IDP" in properties2 else 0
-        join_key2 = st.selectbox(
-            "Join Key:",
-            properties2,
-            index=default_join2_index,
-            key="join_key2"
-        )
+        with col2:
+            default_join2_index = properties2_index.get("IDP", 0)
+            join_key2 = st.selectbox(
+                "Join Key:",
+                properties2,
+                index=default_join2_index,
+                key="join_key2"
+            )
     
-    with col3:
-        # Stock has no filter keys in test.py
-        filter_keys2 = st.multiselect(
-            "Filter Keys:",
-            properties2,
-            default=[],
-            key="join_filter2"
-        )
+        with col3:
+            # Stock has no filter keys in test.py
+            filter_keys2 = st.multiselect(
+                "Filter Keys:",
+                properties2,
+                default=[],
+                key="join_filter2"
+            )
     
-    col1, col2 = st.columns(2)
-    with col1:
-        sharding2 = st.checkbox(f"Enable Sharding for {collection2}", value=True, key="join_shard2")
-    with col2:
-        sharding_key2 = None
-        if sharding2:
-            default_shard2_index = properties2.index("IDP") if "IDP" in properties2 else 0
+        col1, col2 = st.columns(2)
+        with col1:
+            sharding2 = st.checkbox(f"Enable Sharding for {collection2}", value=True, key="join_shard2")
+        with col2:
+            default_shard2_index = properties2_index.get("IDP", 0)
             sharding_key2 = st.selectbox(
                 f"Sharding Key for {collection2}:",
                 properties2,
                 index=default_shard2_index,
                 key="join_shard_key2"
             )
+        
+        # Compute button
+        submitted = st.form_submit_button("Compute Join Query Costs", type="primary")
     
-    # Compute button
-    if st.button("Compute Join Query Costs", type="primary", key="join_compute"):
+    if submitted:
         if not output_keys1 and not output_keys2:
             st.error("Please select at least one output key for one collection")
         else:
@@ -336,41 +318,14 @@ with tab2:
                     # Per-collection metrics
                     col1, col2 = st.columns(2)
                     
-                    with col1:
-                        st.subheader(f"{collection1} Metrics")
-                        st.metric("Servers Checked", f"{results['nb_servers_checked'][collection1]}")
-                        st.metric("Output Documents", f"{results['nb_output_docs'][collection1]:,}")
-                        st.metric("Scanned Doc Size", f"{results['scanned_doc_byte_size'][collection1]:,} B")
-                        
-                        scanned_size = results['scanned_data_byte_size'][collection1]
-                        st.metric(
-                            "Scanned Data",
-                            f"{scanned_size:,} B" if scanned_size < 10**6 else f"{scanned_size/10**9:.3f} GB"
-                        )
-                        
-                        output_size = results['output_data_byte_size'][collection1]
-                        st.metric(
-                            "Output Data",
-                            f"{output_size:,} B" if output_size < 10**6 else f"{output_size/10**9:.3f} GB"
-                        )
-                    
-                    with col2:
-                        st.subheader(f"{collection2} Metrics")
-                        st.metric("Servers Checked", f"{results['nb_servers_checked'][collection2]}")
-                        st.metric("Output Documents", f"{results['nb_output_docs'][collection2]:,}")
-                        st.metric("Scanned Doc Size", f"{results['scanned_doc_byte_size'][collection2]:,} B")
-                        
-                        scanned_size = results['scanned_data_byte_size'][collection2]
-                        st.metric(
-                            "Scanned Data",
-                            f"{scanned_size:,} B" if scanned_size < 10**6 else f"{scanned_size/10**9:.3f} GB"
-                        )
-                        
-                        output_size = results['output_data_byte_size'][collection2]
-                        st.metric(
-                            "Output Data",
-                            f"{output_size:,} B" if output_size < 10**6 else f"{output_size/10**9:.3f} GB"
-                        )
+                    for col, collection in ((col1, collection1), (col2, collection2)):
+                        with col:
+                            st.subheader(f"{collection} Metrics")
+                            st.metric("Servers Checked", f"{results['nb_servers_checked'][collection]}")
+                            st.metric("Output Documents", f"{results['nb_output_docs'][collection]:,}")
+                            st.metric("Scanned Doc Size", f"{results['scanned_doc_byte_size'][collection]:,} B")
+                            st.metric("Scanned Data", format_byte_size(results['scanned_data_byte_size'][collection]))
+                            st.metric("Output Data", format_byte_size(results['output_data_byte_size'][collection]))
                     
                     # Total costs
                     st.subheader("Total Join Query Costs")
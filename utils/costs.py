@@ -0,0 +1,16 @@
+from settings import COST_INFOS
+
+# Keys of the costs returned by compute_costs, shared by all query results
+COST_KEYS = ("time_cost_seconds", "carbon_footprint_kgCO2eq", "price_cost_€")
+
+SECONDS_PER_BYTE = 1 / COST_INFOS["bandwidth"]
+CARBON_FOOTPRINT_PER_BYTE = COST_INFOS["carbon_footprint"]
+PRICE_PER_BYTE = COST_INFOS["price"]
+
+def compute_costs(total_data_size):
+    # Time, carbon footprint and price of transferring total_data_size bytes
+    return {
+        "time_cost_seconds": total_data_size * SECONDS_PER_BYTE,
+        "carbon_footprint_kgCO2eq": total_data_size * CARBON_FOOTPRINT_PER_BYTE,
+        "price_cost_€": total_data_size * PRICE_PER_BYTE
+    }
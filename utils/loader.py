@@ -1,45 +1,132 @@
 import json
+from collections.abc import Mapping
 from pathlib import Path
+from types import MappingProxyType
+
+# Parsed schemas by folder, along with the file modification times they were read at
+_schemas_cache = {}
+
+# Values derived from each loaded schema (flattened properties, sizes) by schema id.
+# Entries are dropped when their folder is reloaded, so they never outlive the schemas
+_derived_values = {}
 
 def load_schemas_from_folder(folder: str | Path = "./schemas") -> dict[str, dict]:
     if not isinstance(folder, Path):
         folder = Path(folder)
     
+    # An unknown folder has no schemas, so callers report the missing collection
+    if not folder.is_dir():
+        return {}
+
+    paths = sorted(path for path in folder.iterdir() if path.suffix == ".json")
+    mtimes = tuple((path.name, path.stat().st_mtime_ns) for path in paths)
+
+    # Reuse the parsed schemas as long as no file was added, removed or modified
+    cached = _schemas_cache.get(folder.resolve())
+    if cached is not None and cached[0] == mtimes:
+        return cached[1]
+
+    if cached is not None:
+        for schema in cached[1].values():
+            _derived_values.pop(id(schema), None)
+
     schemas = {}
 
-    for filename in folder.glob("*.json"):
-        path = folder / filename.name
+    for path in paths:
         with open(path, "r") as f:
             json_schema = json.load(f)
-            f.close()
-        name = filename.stem
+        name = path.stem
         
         schemas[name] = json_schema
+        _derived_values[id(json_schema)] = (json_schema, {})
     
+    _schemas_cache[folder.resolve()] = (mtimes, schemas)
     return schemas
 
-def get_all_properties(schema:dict) -> list[str]:
+# Parsed schemas of a database, shared across cost computations (do not mutate)
+def load_database_schemas(database: str) -> dict[str, dict]:
+    return load_schemas_from_folder(Path(f"schemas/{database}"))
+
+def get_derived_values(schema: dict) -> dict | None:
+    # Cache for values derived from a loaded schema, or None for schemas the loader does not hold
+    entry = _derived_values.get(id(schema))
+    if entry is not None and entry[0] is schema:
+        return entry[1]
+    return None
+
+def get_all_properties(schema:dict) -> Mapping[str, str]:
+    derived = get_derived_values(schema)
+    if derived is not None and "all_properties" in derived:
+        return derived["all_properties"]
+
     properties_dict = {}
 
-    properties = schema.get("properties", {})
-    for field_name, field_props in properties.items():
-        ftype = field_props.get("type")
-        if ftype == "object":
-            nested_props = get_all_properties(field_props)
-            properties_dict.update(nested_props)
-        elif ftype == "array":
-            items = field_props.get("items", {})
-            if items.get("type") == "object":
-                nested_props = get_all_properties(items)
-                properties_dict.update(nested_props)
-            else:
-                if items.get("type") == "string" and items.get("format"):
+    # Depth-first walk with a stack of property iterators, so nested properties
+    # are visited in the same order as a recursive walk
+    stack = [iter(schema.get("properties", {}).items())]
+    while stack:
+        for field_name, field_props in stack[-1]:
+            ftype = field_props.get("type")
+            if ftype == "array":
+                items = field_props.get("items", {})
+                if items.get("type") == "object":
+                    field_props, ftype = items, "object"
+                elif items.get("type") == "string" and items.get("format"):
                     ftype = items["format"]
-                
-                properties_dict.update({field_name: ftype})
-        else:
+            if ftype == "object":
+                stack.append(iter(field_props.get("properties", {}).items()))
+                break
             if ftype == "string" and field_props.get("format"):
                 ftype = field_props["format"]
-            properties_dict.update({field_name: ftype})
-        
-    return properties_dict
\ No newline at end of file
+            properties_dict[field_name] = ftype
+        else:
+            stack.pop()
+
+    # Read-only view, since the same mapping is returned to every caller
+    properties_dict = MappingProxyType(properties_dict)
+    if derived is not None:
+        derived["all_properties"] = properties_dict
+    return properties_dict
+
+def get_collection_properties(
+    database: str,
+    collection: str,
+    schemas: dict[str, dict] | None = None
+) -> frozenset[str]:
+    # Use the caller's schemas when given, so validation matches the schemas used for costs
+    if schemas is None:
+        schemas = load_database_schemas(database)
+    schema = schemas[collection]
+    derived = get_derived_values(schema)
+    if derived is not None and "property_names" in derived:
+        return derived["property_names"]
+
+    property_names = frozenset(get_all_properties(schema))
+    if derived is not None:
+        derived["property_names"] = property_names
+    return property_names
+
+
+def validate_collection_keys(
+    database: str,
+    collection: str,
+    keys_by_kind: dict[str, set[str]],
+    schemas: dict[str, dict] | None = None
+):
+    # Report every key that is not a property of the collection in a single error
+    properties = get_collection_properties(database, collection, schemas)
+    missing_keys = {
+        kind: keys - properties
+        for kind, keys in keys_by_kind.items()
+        if keys - properties
+    }
+    if missing_keys:
+        missing = "; ".join(
+            f"{kind} key(s) {', '.join(repr(key) for key in sorted(keys))}"
+            for kind, keys in missing_keys.items()
+        )
+        available_keys = ", ".join(sorted(properties))
+        raise ValueError(
+            f"Invalid keys for collection '{collection}': {missing}. "
+            f"Available properties: {available_keys}"
+        )
@@ -1,13 +1,10 @@
-from pathlib import Path
+from .loader import load_database_schemas
 
-from .loader import load_schemas_from_folder
-
-from settings import STATISTICS, NB_DOCS, NB_SERVERS
+from settings import DISTINCT_VALUES, NB_DOCS, NB_SERVERS
 
 def compute_sharding_distribution(collection_name: str, sharding_key: str):
     # Load the default schemas to check if sharding_key is valid
-    schemas_path = Path("schemas/default")
-    schemas = load_schemas_from_folder(schemas_path)
+    schemas = load_database_schemas("default")
     
     # Check if the collection exists in the schemas
     if collection_name not in schemas:
@@ -28,15 +25,35 @@ def compute_sharding_distribution(collection_name: str, sharding_key: str):
     
     # Get the number of distinct values for the sharding key
     # If not found, default to total number of documents in the collection
-    stat = f"distinct_{sharding_key}"
-    if not stat.endswith("s"):
-        stat += "s"
-    nb_distinct_values = STATISTICS.get(stat, nb_values)
+    nb_distinct_values = DISTINCT_VALUES.get(sharding_key, nb_values)
 
     nb_servers_used = min(NB_SERVERS, nb_distinct_values)
+    if nb_servers_used == 0:
+        raise ValueError(
+            f"Cannot shard collection '{collection_name}' on '{sharding_key}': "
+            f"no document or distinct value to distribute"
+        )
 
     return {
         "docs_per_server": nb_values / nb_servers_used,
         "distinct_values_per_server": nb_distinct_values / nb_servers_used,
         "nb_servers_used": nb_servers_used
-    }
\ No newline at end of file
+    }
+
+def compute_scanned_servers(
+    collection_name: str,
+    sharding: bool,
+    sharding_key: str | None,
+    filter_keys: list[str]
+) -> tuple[int, float]:
+    # Number of servers checked by a query and number of documents scanned on them
+    if not sharding:
+        return NB_SERVERS, NB_DOCS.get(collection_name, 0)
+
+    sharding_distribution = compute_sharding_distribution(collection_name, sharding_key)
+    if sharding_key in filter_keys:
+        nb_servers_checked = 1
+    else:
+        nb_servers_checked = sharding_distribution["nb_servers_used"]
+
+    return nb_servers_checked, sharding_distribution["docs_per_server"] * nb_servers_checked
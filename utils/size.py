@@ -1,9 +1,22 @@
-from .loader import load_schemas_from_folder, get_all_properties
+from collections.abc import Mapping
+from types import MappingProxyType
+
+from .loader import load_schemas_from_folder, get_all_properties, get_derived_values
 
 from settings import NB_DOCS, KEY_SIZE, VALUE_SIZES, STATISTICS
 from pathlib import Path
 
+# Shared schema for arrays without items (never mutated)
+EMPTY_SCHEMA = {}
+
 def estimate_doc_size(schema: dict, table_title: str = '') -> int:
+    # Only loaded collection schemas are cached, keyed on the title argument
+    # before it defaults to the schema's own title
+    derived = get_derived_values(schema)
+    cache_key = ("doc_size", table_title)
+    if derived is not None and cache_key in derived:
+        return derived[cache_key]
+
     total_size = 0
     if table_title == '':
         table_title = schema.get("title", table_title)
@@ -12,20 +25,23 @@ def estimate_doc_size(schema: dict, table_title: str = '') -> int:
         ftype = field_props.get("type")
         total_size += KEY_SIZE  # Size of the key
 
-        if ftype in VALUE_SIZES:
-            if ftype == "string" and field_props.get("format"): # Handle string formats (date and longstring)
-                total_size += VALUE_SIZES[field_props["format"]]
-            else:
-                total_size += VALUE_SIZES[ftype]
+        value_size = VALUE_SIZES.get(ftype)
+        if value_size is not None:
+            fmt = field_props.get("format") if ftype == "string" else None
+            if fmt: # Handle string formats (date and longstring)
+                value_size = VALUE_SIZES[fmt]
+            total_size += value_size
 
         elif ftype == "object":
             total_size += estimate_doc_size(field_props)
 
         elif ftype == "array":
             nb_items = STATISTICS.get(f"avg_{field_name}_by_{table_title.lower()}", 1)
-            items = field_props.get("items", {})
+            items = field_props.get("items") or EMPTY_SCHEMA
             total_size += estimate_doc_size(items) * nb_items
 
+    if derived is not None:
+        derived[cache_key] = total_size
     return total_size
 
 def compute_db_size(schemas_folder_path: str | Path) -> dict:
@@ -53,23 +69,36 @@ def compute_db_size(schemas_folder_path: str | Path) -> dict:
     
     return results
 
+def get_property_sizes(schema: dict) -> Mapping[str, int | None]:
+    derived = get_derived_values(schema)
+    if derived is not None and "property_sizes" in derived:
+        return derived["property_sizes"]
+
+    # Key and value size of each property (None for unsupported field types)
+    property_sizes = MappingProxyType({
+        key: KEY_SIZE + VALUE_SIZES[ftype] if ftype in VALUE_SIZES else None
+        for key, ftype in get_all_properties(schema).items()
+    })
+
+    if derived is not None:
+        derived["property_sizes"] = property_sizes
+    return property_sizes
+
 def get_custom_doc_size(
     schema: dict,
     keys: set[str]
 ) -> int:
     total_size = 0
-    properties = get_all_properties(schema)
+    property_sizes = get_property_sizes(schema)
 
     for key in keys:
-        if key not in properties:
+        if key not in property_sizes:
             raise ValueError(f"Key '{key}' not found in schema properties")
         
-        ftype = properties[key]
-        total_size += KEY_SIZE  # Size of the key
-
-        if ftype in VALUE_SIZES:
-            total_size += VALUE_SIZES[ftype]
-        else:
+        size = property_sizes[key]
+        if size is None:
+            ftype = get_all_properties(schema)[key]
             raise ValueError(f"Unsupported field type '{ftype}' for key '{key}'")
+        total_size += size
     
     return total_size
\ No newline at end of file